@@ -274,7 +274,7 @@ if (prevBtn) {
 // ----------------------------------------------------
 // Algorithm execution
 // ----------------------------------------------------
-function runReingoldAlgorithm() {
+async function runReingoldAlgorithm() {
     console.log('Starting Reingold algorithm...');
     console.log('Input graph:', inputGraph);
     console.log('Input graph nodes:', inputGraph.nodes);
@@ -284,12 +284,16 @@ function runReingoldAlgorithm() {
     
     try {
         // Use B=2 for cleaner visualization (smaller clouds)
-        algorithm = new ReingoldAlgorithm(inputGraph, sNode, tNode, 2);
+        const run = new ReingoldAlgorithm(inputGraph, sNode, tNode, 2);
+        algorithm = run;
         console.log('Algorithm created:', algorithm);
         console.log('L (iterations):', algorithm.L);
         console.log('B:', algorithm.B);
         
-        algorithm.initialize();
+        // Asks the server first, which can take a few seconds
+        showStatus("Checking connectivity...", "info");
+        await run.initialize();
+        if (algorithm !== run) return;  // Run was clicked again meanwhile
         console.log('Algorithm initialized!');
         console.log('Stages:', algorithm.stages);
         console.log('Number of stages:', algorithm.stages ? algorithm.stages.length : 'undefined');
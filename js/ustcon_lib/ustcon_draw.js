@@ -710,10 +710,16 @@ function drawSummary(ctx, frame, width, top, height) {
 // CODE EXECUTION VIEW
 // =========================================================
 
+// null: the walks searched never reached t, which proves nothing either way
+function resultColor(result) {
+    if (result === null) return '#f59e0b';
+    return result ? '#10b981' : '#ef4444';
+}
+
 function drawCodeExecution(ctx, frame, width, height) {
     // Title - show result color if conclusion
     if (frame.conclusion) {
-        ctx.fillStyle = frame.result ? '#10b981' : '#ef4444';
+        ctx.fillStyle = resultColor(frame.result);
     } else {
         ctx.fillStyle = '#f59e0b';
     }
@@ -869,8 +875,9 @@ function drawCodeExecution(ctx, frame, width, height) {
     
     // Conclusion - show big result
     if (frame.conclusion) {
-        const resultText = frame.result ? '✓ s and t are CONNECTED' : '✗ s and t are NOT CONNECTED';
-        ctx.fillStyle = frame.result ? '#10b981' : '#ef4444';
+        const resultText = frame.result === null ? '? t not reached within the search limits'
+            : frame.result ? '✓ s and t are CONNECTED' : '✗ s and t are NOT CONNECTED';
+        ctx.fillStyle = resultColor(frame.result);
         ctx.font = 'bold 16px Arial';
         ctx.textAlign = 'center';
         ctx.fillText(resultText, width / 2, height - 15);
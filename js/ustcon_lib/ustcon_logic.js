@@ -1,6 +1,14 @@
 const D = 16;
 const H_SIZE = D * D;
 
+const SERVER_URL = 'http://localhost:5000';
+const SERVER_TIMEOUT_MS = 15000;
+
+// Without the server, the exhaustive walk search below only runs on small
+// graphs: it tries 3^path_len walks for every length
+const LOCAL_SEARCH_MAX_N = 16;
+const LOCAL_MAX_PATH_LEN = 8;
+
 class MemoryRegisters {
     constructor(N) {
         this.N = N;
@@ -19,8 +27,8 @@ class MemoryRegisters {
 function rot_G_16reg(adj, N, v, i) {
     const a = Math.floor(v / N);
     const b = v % N;
-    if (i === 0) return ((a + 1) % N) * N + b;
-    if (i === 1) return ((a - 1 + N) % N) * N + b;
+    // Only edges of G may move a, otherwise reaching t says nothing about G
+    if (i === 0 || i === 1) return v;
     if (i === 2) return a * N + ((b + 1) % N);
     if (i === 3) return a * N + ((b - 1 + N) % N);
     if (i >= 4 && i < 10) {
@@ -67,11 +75,11 @@ function rot_Gexp(adj, N, v_h, i, level) {
     return current;
 }
 
-function ustcon(adj, N, s, t) {
+function ustcon(adj, N, s, t, maxPathLen = 50) {
     const N2 = N * N;
     const L = Math.max(1, 2 * Math.ceil(Math.log2(Math.max(2, D * N2))));
     const s_ext = s * N;
-    for (let path_len = 1; path_len <= Math.min(50, 2 * N2); path_len++) {
+    for (let path_len = 1; path_len <= Math.min(maxPathLen, 2 * N2); path_len++) {
         const total_paths = Math.pow(3, path_len);
         for (let path_idx = 0; path_idx < total_paths; path_idx++) {
             let current = s_ext * H_SIZE;
@@ -92,6 +100,19 @@ function ustcon(adj, N, s, t) {
     return false;
 }
 
+function sameComponent(adj, s, t) {
+    const seen = new Set([s]);
+    const queue = [s];
+    while (queue.length > 0) {
+        const u = queue.shift();
+        if (u === t) return true;
+        for (const v of adj[u] || []) {
+            if (!seen.has(v)) { seen.add(v); queue.push(v); }
+        }
+    }
+    return false;
+}
+
 export class ReingoldAlgorithm {
     constructor(graph, s, t, B = 2) {
         this.originalGraph = graph;
@@ -107,7 +128,10 @@ export class ReingoldAlgorithm {
         this.L = Math.max(1, Math.ceil(Math.log2(n)));
         this.memory = new MemoryRegisters(n);
         this.adj = this.buildAdj(graph);
-        this.connected = this.checkConnectivity();
+        // true / false, or null when no walk reached t within the limits;
+        // set by initialize()
+        this.connected = null;
+        this.trace = null;
     }
 
     buildAdj(graph) {
@@ -124,15 +148,26 @@ export class ReingoldAlgorithm {
         return adj;
     }
 
-    checkConnectivity() {
+    async checkConnectivity() {
         if (this.N < 2) return false;
         const sIdx = this.s;
         const tIdx = this.t;
         if (sIdx === tIdx) return true;
-        return ustcon(this.adj, this.N, sIdx, tIdx);
+        try {
+            const data = await fetchServerTrace(this.originalGraph, sIdx, tIdx);
+            this.trace = data.trace;
+            return data.connected;
+        } catch (error) {
+            console.warn('USTCON server unavailable, searching locally:', error.message);
+        }
+        // Walks only move along edges, so they can't reach t in another component
+        if (!sameComponent(this.adj, sIdx, tIdx)) return false;
+        if (this.N > LOCAL_SEARCH_MAX_N) return null;
+        return ustcon(this.adj, this.N, sIdx, tIdx, LOCAL_MAX_PATH_LEN) || null;
     }
 
-    initialize() {
+    async initialize() {
+        this.connected = await this.checkConnectivity();
         this.createDemoAnimation();
         this.createCodeExecutionStages();
         return this.stages;
@@ -188,7 +223,7 @@ export class ReingoldAlgorithm {
             implicitV = newV;
         }
         this.stages.push({ name: 'Path Enumeration', type: 'code-execution', code: algorithmCode, highlightLine: 5, stats: { 'Path lengths': '1 to O(N²)', 'Each path': '3 edge types per step', 'Memory': 'O(log N) bits only', 'Space': spaceUsed + ' bits' }});
-        this.stages.push({ name: 'Result', type: 'code-execution', code: algorithmCode, highlightLine: 9, stats: { 'Final |V| (implicit)': this.formatNumber(implicitV), 'Space used': spaceUsed + ' bits = O(log N)', 's → t': this.connected ? 'CONNECTED ✓' : 'NOT CONNECTED ✗' }, result: this.connected, conclusion: true });
+        this.stages.push({ name: 'Result', type: 'code-execution', code: algorithmCode, highlightLine: 9, stats: { 'Final |V| (implicit)': this.formatNumber(implicitV), 'Space used': spaceUsed + ' bits = O(log N)', 's → t': this.connected === null ? 'UNKNOWN (t not reached)' : this.connected ? 'CONNECTED ✓' : 'NOT CONNECTED ✗' }, result: this.connected, conclusion: true });
     }
 
     formatNumber(n) {
@@ -203,3 +238,30 @@ export class ReingoldAlgorithm {
     prevStage() { if (this.currentStage > 0) this.currentStage--; return this.getCurrentStage(); }
     getProgress() { return { current: this.currentStage + 1, total: this.stages.length, percentage: Math.round(((this.currentStage + 1) / this.stages.length) * 100) }; }
 }
+
+// Same search on the Manim server (manim_server/ustcon_engine.py), for graphs
+// too large to enumerate in the browser. Resolves to the walk trace JSON.
+export async function fetchServerTrace(graph, s, t, serverUrl = SERVER_URL, timeoutMs = SERVER_TIMEOUT_MS) {
+    const index = n => typeof n === 'object' ? graph.nodes.indexOf(n) : n;
+    const controller = new AbortController();
+    const timer = setTimeout(() => controller.abort(), timeoutMs);
+    let response;
+    try {
+        response = await fetch(`${serverUrl}/ustcon/trace`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({
+                n: Math.max(2, graph.nodes.length),
+                edges: graph.edges.map(e => [index(e.node1), index(e.node2)]),
+                s: typeof s === 'object' ? s.id : s,
+                t: typeof t === 'object' ? t.id : t
+            }),
+            signal: controller.signal
+        });
+    } finally {
+        clearTimeout(timer);
+    }
+    const data = await response.json();
+    if (data.status !== 'success') throw new Error(data.error || 'Unknown error');
+    return data;
+}
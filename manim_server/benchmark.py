@@ -0,0 +1,377 @@
+"""
+Manim Benchmark Suite - times every shipped scene at every quality
+Renders each Scene class in the scene files below directly through the Manim
+CLI (cold, per-phase timings, peak RSS, output size) and through the Flask
+/render endpoint (cold cache, then warm cache), writes the results as JSON
+and compares them against a saved baseline.
+
+Runs fully offline on a CPU-only box (Cairo renderer, no network access).
+
+Usage:
+    python benchmark.py                          # full suite
+    python benchmark.py -q low --scene BFS       # subset
+    python benchmark.py --save-baseline          # record a new baseline
+    python benchmark.py --baseline bench_results/baseline.json --threshold 0.2
+"""
+
+import argparse
+import ast
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+SERVER_DIR = Path(__file__).parent
+REPO_ROOT = SERVER_DIR.parent
+RESULTS_DIR = SERVER_DIR / "bench_results"
+DEFAULT_BASELINE = RESULTS_DIR / "baseline.json"
+
+# Every scene file we ship
+SCENE_FILES = [
+    SERVER_DIR / "manim_scenes" / "graph_traversal.py",
+    SERVER_DIR / "manim_scenes" / "ustcon_walk.py",
+    REPO_ROOT / "manim_src" / "behrend.py",
+]
+
+QUALITIES = ['low', 'medium', 'high']
+QUALITY_FLAGS = {
+    'low': '-ql',
+    'medium': '-qm',
+    'high': '-qh'
+}
+
+# Metrics checked against the baseline (higher is worse)
+COMPARED_METRICS = [
+    ('cold', 'wall_time'),
+    ('cold', 'peak_rss_kb'),
+    ('server_cold', 'wall_time'),
+    ('server_warm', 'wall_time'),
+]
+
+# Ignore timing deltas smaller than this, warm hits are only a few ms
+MIN_TIME_DELTA = 0.05
+
+
+def discover_scenes(scene_file):
+    """Return the names of all Scene subclasses defined in a file"""
+    tree = ast.parse(Path(scene_file).read_text())
+    scenes = []
+    for node in tree.body:
+        if not isinstance(node, ast.ClassDef):
+            continue
+        for base in node.bases:
+            name = base.id if isinstance(base, ast.Name) else getattr(base, 'attr', '')
+            if name.endswith('Scene'):
+                scenes.append(node.name)
+                break
+    return scenes
+
+
+def manim_version():
+    try:
+        result = subprocess.run(
+            ['manim', '--version'],
+            capture_output=True,
+            text=True,
+            timeout=30
+        )
+        return result.stdout.strip() if result.returncode == 0 else None
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+
+
+def render_direct(scene_file, scene_name, quality, timeout):
+    """
+    Render one scene through the Manim CLI in a fresh media dir.
+
+    Phases are taken from the log stream. Manim logs "Animation N : Partial
+    movie file written" only after animation N is rendered, so:
+      first_animation      - interpreter start, imports, construct() setup and
+                             rendering animation 0
+      remaining_animations - rendering animations 1..N
+      combine              - concatenating partial movies into the final file
+    """
+    media_dir = Path(tempfile.mkdtemp(prefix='bench_'))
+    output_name = f"bench_{scene_name}_{quality}"
+    cmd = [
+        'manim',
+        QUALITY_FLAGS[quality],
+        str(scene_file),
+        scene_name,
+        '-o', output_name,
+        '--media_dir', str(media_dir),
+        '--progress_bar', 'none',
+        '--disable_caching'
+    ]
+
+    marks = {}
+    log_tail = []
+    start = time.perf_counter()
+    try:
+        proc = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            cwd=str(Path(scene_file).parent),
+            # Wide console so Rich doesn't wrap the log lines we match on
+            env={**os.environ, 'COLUMNS': '400'}
+        )
+        timer = threading.Timer(timeout, proc.kill)
+        timer.start()
+        try:
+            for line in proc.stdout:
+                now = time.perf_counter()
+                if 'Animation 0' in line and 'first' not in marks:
+                    marks['first'] = now
+                if 'Combining to Movie file' in line and 'combine' not in marks:
+                    marks['combine'] = now
+                log_tail = (log_tail + [line.rstrip()])[-20:]
+            # wait4 gives us the rusage of this child alone
+            _, status, rusage = os.wait4(proc.pid, 0)
+            proc.returncode = os.waitstatus_to_exitcode(status)
+        finally:
+            timed_out = not timer.is_alive() and proc.returncode != 0
+            timer.cancel()
+        end = time.perf_counter()
+
+        videos = list(media_dir.rglob(f"{output_name}.mp4"))
+        first_at = marks.get('first', end)
+        combine_at = marks.get('combine', end)
+        return {
+            'ok': proc.returncode == 0 and bool(videos),
+            'returncode': proc.returncode,
+            'timed_out': timed_out,
+            'wall_time': end - start,
+            'phases': {
+                'first_animation': first_at - start,
+                'remaining_animations': combine_at - first_at,
+                'combine': end - combine_at
+            },
+            'peak_rss_kb': rusage.ru_maxrss,
+            'cpu_time': rusage.ru_utime + rusage.ru_stime,
+            'output_bytes': videos[0].stat().st_size if videos else None,
+            'log_tail': None if proc.returncode == 0 else log_tail
+        }
+    finally:
+        shutil.rmtree(media_dir, ignore_errors=True)
+
+
+def render_via_server(client, code, scene_name, quality, parallel=False):
+    """POST to /render through the Flask test client and time the round trip"""
+    start = time.perf_counter()
+    response = client.post('/render', json={
+        'code': code,
+        'scene_name': scene_name,
+        'quality': quality,
+        'parallel': parallel
+    })
+    end = time.perf_counter()
+    data = response.get_json() or {}
+    return {
+        'ok': data.get('status') == 'success',
+        'status_code': response.status_code,
+        'cached': data.get('cached'),
+        'wall_time': end - start,
+        'error': None if data.get('status') == 'success' else data.get('error')
+    }
+
+
+def server_client():
+    """
+    Import the Flask app with its cache and output dirs pointed at a scratch
+    directory, so the suite never touches (or benefits from) the real cache.
+    """
+    sys.path.insert(0, str(SERVER_DIR))
+    import server
+
+    scratch = Path(tempfile.mkdtemp(prefix='bench_server_'))
+    server.MANIM_OUTPUT_DIR = scratch / "manim_output"
+    server.CACHE_DIR = scratch / "cache"
+    return server, server.app.test_client(), scratch
+
+
+def reset_server_dirs(server):
+    for directory in (server.MANIM_OUTPUT_DIR, server.CACHE_DIR):
+        shutil.rmtree(directory, ignore_errors=True)
+        directory.mkdir(parents=True)
+
+
+def median_run(runs):
+    """Collapse repeated runs into one record, using the median wall time"""
+    ok_runs = [r for r in runs if r['ok']]
+    if not ok_runs:
+        return runs[-1]
+    ok_runs.sort(key=lambda r: r['wall_time'])
+    record = dict(ok_runs[len(ok_runs) // 2])
+    record['wall_time'] = statistics.median(r['wall_time'] for r in ok_runs)
+    record['runs'] = [r['wall_time'] for r in runs]
+    return record
+
+
+def run_suite(args):
+    results = []
+    server = client = scratch = None
+    if not args.skip_server:
+        server, client, scratch = server_client()
+
+    try:
+        for scene_file in SCENE_FILES:
+            code = scene_file.read_text()
+            rel_file = str(scene_file.relative_to(REPO_ROOT))
+            for scene_name in discover_scenes(scene_file):
+                if args.scene and not any(s in scene_name for s in args.scene):
+                    continue
+                for quality in args.quality:
+                    print(f"⏱  {rel_file}::{scene_name} [{quality}]", flush=True)
+                    entry = {
+                        'file': rel_file,
+                        'scene': scene_name,
+                        'quality': quality
+                    }
+
+                    entry['cold'] = median_run([
+                        render_direct(scene_file, scene_name, quality, args.timeout)
+                        for _ in range(args.repeat)
+                    ])
+
+                    if client is not None:
+                        cold_runs, warm_runs = [], []
+                        for _ in range(args.repeat):
+                            reset_server_dirs(server)
+                            cold_runs.append(render_via_server(
+                                client, code, scene_name, quality, args.parallel))
+                            warm_runs.append(render_via_server(
+                                client, code, scene_name, quality, args.parallel))
+                        entry['server_cold'] = median_run(cold_runs)
+                        entry['server_warm'] = median_run(warm_runs)
+
+                    results.append(entry)
+                    print(f"   cold {entry['cold']['wall_time']:.2f}s"
+                          f"  rss {entry['cold']['peak_rss_kb'] / 1024:.0f} MiB"
+                          + (f"  server cold {entry['server_cold']['wall_time']:.2f}s"
+                             f"  warm {entry['server_warm']['wall_time'] * 1000:.1f}ms"
+                             if client is not None else ''),
+                          flush=True)
+    finally:
+        if scratch is not None:
+            shutil.rmtree(scratch, ignore_errors=True)
+
+    return {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'manim_version': manim_version(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'repeat': args.repeat,
+            'parallel': args.parallel
+        },
+        'results': results
+    }
+
+
+def result_key(entry):
+    return f"{entry['file']}::{entry['scene']}::{entry['quality']}"
+
+
+def compare(current, baseline, threshold):
+    """Return a list of regressions of current against baseline"""
+    base_by_key = {result_key(e): e for e in baseline.get('results', [])}
+    regressions = []
+    for entry in current['results']:
+        base = base_by_key.get(result_key(entry))
+        if base is None:
+            continue
+        for mode, metric in COMPARED_METRICS:
+            new = entry.get(mode, {})
+            old = base.get(mode, {})
+            if not (new.get('ok') and old.get('ok')):
+                continue
+            new_value, old_value = new.get(metric), old.get(metric)
+            if not new_value or not old_value:
+                continue
+            if metric == 'wall_time' and new_value - old_value < MIN_TIME_DELTA:
+                continue
+            change = (new_value - old_value) / old_value
+            if change > threshold:
+                regressions.append({
+                    'key': result_key(entry),
+                    'mode': mode,
+                    'metric': metric,
+                    'baseline': old_value,
+                    'current': new_value,
+                    'change': change
+                })
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the shipped Manim scenes')
+    parser.add_argument('-q', '--quality', action='append', choices=QUALITIES,
+                        help='quality to run (repeatable, default: all)')
+    parser.add_argument('--scene', action='append',
+                        help='only run scenes whose name contains this (repeatable)')
+    parser.add_argument('--repeat', type=int, default=1,
+                        help='runs per measurement, the median is kept')
+    parser.add_argument('--timeout', type=float, default=900,
+                        help='per-render timeout in seconds')
+    parser.add_argument('--skip-server', action='store_true',
+                        help='skip the cold/warm runs through the Flask /render path')
+    parser.add_argument('--parallel', action='store_true',
+                        help='ask the server to render scene sections in parallel')
+    parser.add_argument('-o', '--output', type=Path,
+                        help='where to write the results JSON')
+    parser.add_argument('--baseline', type=Path, default=DEFAULT_BASELINE,
+                        help='baseline JSON to compare against')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='also write the results as the new baseline')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='allowed slowdown before a metric counts as a regression')
+    args = parser.parse_args()
+    args.quality = args.quality or QUALITIES
+
+    if shutil.which('manim') is None:
+        print("❌ manim not found on PATH")
+        return 2
+
+    report = run_suite(args)
+
+    RESULTS_DIR.mkdir(exist_ok=True)
+    output = args.output or RESULTS_DIR / f"bench_{datetime.now():%Y%m%d_%H%M%S}.json"
+    output.write_text(json.dumps(report, indent=2))
+    print(f"📁 Results: {output}")
+
+    failed = [result_key(e) for e in report['results']
+              if not all(e[m]['ok'] for m in ('cold', 'server_cold', 'server_warm') if m in e)]
+    for key in failed:
+        print(f"❌ render failed: {key}")
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2))
+        print(f"📁 Baseline saved: {args.baseline}")
+        return 1 if failed else 0
+
+    if not args.baseline.exists():
+        print("⚠️  No baseline to compare against (run with --save-baseline)")
+        return 1 if failed else 0
+
+    regressions = compare(report, json.loads(args.baseline.read_text()), args.threshold)
+    for r in regressions:
+        print(f"🐢 {r['key']} {r['mode']}.{r['metric']}: "
+              f"{r['baseline']:.3f} → {r['current']:.3f} (+{r['change']:.0%})")
+    if not regressions:
+        print(f"✅ No regressions over {args.threshold:.0%} against {args.baseline}")
+    return 1 if (regressions or failed) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
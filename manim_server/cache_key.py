@@ -0,0 +1,158 @@
+"""
+Semantic cache keys for submitted scene code
+Hashes a normalized AST instead of the raw source, so formatting, comments,
+docstrings, unused imports and edits to unrelated classes in the same file
+don't force a re-render of an otherwise identical scene.
+"""
+
+import ast
+import hashlib
+
+KEY_LENGTH = 12
+
+
+def _strip_docstrings(tree):
+    """Drop docstrings from the module, classes and functions in place"""
+    for node in ast.walk(tree):
+        if not isinstance(node, (ast.Module, ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+        body = node.body
+        if (body and isinstance(body[0], ast.Expr)
+                and isinstance(body[0].value, ast.Constant)
+                and isinstance(body[0].value.value, str)):
+            node.body = body[1:] or [ast.Pass()]
+
+
+# Expressions that can run arbitrary code when evaluated
+_SIDE_EFFECTS = (ast.Call, ast.Await, ast.Yield, ast.YieldFrom, ast.NamedExpr)
+
+
+def _may_run_code(nodes):
+    return any(isinstance(node, _SIDE_EFFECTS)
+               for root in nodes if root is not None
+               for node in ast.walk(root))
+
+
+def _assigned_names(stmt):
+    """Names an assignment binds, or None if a target isn't a plain name"""
+    targets = stmt.targets if isinstance(stmt, ast.Assign) else [stmt.target]
+    names = set()
+    for target in targets:
+        for node in ast.walk(target):
+            if isinstance(node, ast.Name):
+                names.add(node.id)
+            elif not isinstance(node, (ast.Tuple, ast.List, ast.Starred, ast.expr_context)):
+                # Attribute/subscript targets mutate something else
+                return None
+    return names
+
+
+def _runs_code(stmt):
+    """
+    Whether running a def, class or assignment can do more than bind
+    names: decorators, defaults, base classes, class bodies and assigned
+    values are all evaluated at definition time.
+    """
+    if isinstance(stmt, (ast.FunctionDef, ast.AsyncFunctionDef)):
+        args = stmt.args
+        return _may_run_code(stmt.decorator_list + args.defaults + args.kw_defaults)
+    if isinstance(stmt, ast.ClassDef):
+        header = stmt.decorator_list + stmt.bases + [kw.value for kw in stmt.keywords]
+        return _may_run_code(header) or any(_runs_code(s) for s in stmt.body)
+    if isinstance(stmt, (ast.Assign, ast.AnnAssign, ast.AugAssign)):
+        return (_assigned_names(stmt) is None
+                or _may_run_code([stmt.value, getattr(stmt, 'annotation', None)]))
+    if isinstance(stmt, ast.Pass):
+        return False
+    # Anything else in a class body (bare calls, loops, ...) counts as code
+    return True
+
+
+def _bound_names(stmt):
+    """
+    Names a top-level statement binds, or None if it isn't a pure binding.
+    `_ = config.update(...)` binds `_` but matters for its side effect, so
+    it isn't pure.
+    """
+    if isinstance(stmt, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+        return None if _runs_code(stmt) else {stmt.name}
+    if isinstance(stmt, (ast.Import, ast.ImportFrom)):
+        if any(alias.name == '*' for alias in stmt.names):
+            return None
+        return {(alias.asname or alias.name).split('.')[0] for alias in stmt.names}
+    if isinstance(stmt, (ast.Assign, ast.AnnAssign, ast.AugAssign)):
+        return None if _runs_code(stmt) else _assigned_names(stmt)
+    return None
+
+
+def _referenced_names(stmt):
+    return {node.id for node in ast.walk(stmt) if isinstance(node, ast.Name)}
+
+
+def normalize(code, scene_name):
+    """
+    Return a canonical string for the parts of `code` that can affect how
+    `scene_name` renders, or None if the code doesn't parse.
+
+    Kept: the scene class, every top-level definition, assignment or import
+    it (transitively) references, star imports, and any top-level statement
+    that isn't a plain binding or whose value calls something (it may have
+    side effects such as config).
+    Kept statements stay in source order.
+    """
+    try:
+        tree = ast.parse(code)
+    except (SyntaxError, ValueError):
+        return None
+    _strip_docstrings(tree)
+
+    binders = {}
+    keep = set()
+    for index, stmt in enumerate(tree.body):
+        names = _bound_names(stmt)
+        if names is None:
+            keep.add(index)
+            continue
+        for name in names:
+            binders.setdefault(name, []).append(index)
+
+    bound_once = {name for name, indices in binders.items() if len(indices) == 1}
+
+    if scene_name in binders:
+        keep.update(binders[scene_name])
+    else:
+        # Unknown scene, let Manim report it; key on the whole module
+        keep.update(range(len(tree.body)))
+
+    pending = list(keep)
+    while pending:
+        for name in _referenced_names(tree.body[pending.pop()]):
+            for index in binders.pop(name, []):
+                if index not in keep:
+                    keep.add(index)
+                    pending.append(index)
+
+    # Everything keeps its source order (imports shadow each other, class
+    # bodies run at definition time), except that within a run of adjacent
+    # uniquely-named definitions their order doesn't matter
+    parts, run = [], []
+    for index in sorted(keep):
+        stmt = tree.body[index]
+        dumped = ast.dump(stmt, annotate_fields=False, include_attributes=False)
+        if (isinstance(stmt, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef))
+                and stmt.name in bound_once):
+            run.append(dumped)
+            continue
+        parts.extend(sorted(run))
+        run = []
+        parts.append(dumped)
+    parts.extend(sorted(run))
+    return '\n'.join(parts)
+
+
+def scene_cache_key(code, scene_name, quality):
+    """Cache key for rendering `scene_name` from `code` at `quality`"""
+    normalized = normalize(code, scene_name)
+    if normalized is None:
+        normalized = code
+    return hashlib.md5(f"{normalized}{scene_name}{quality}".encode()).hexdigest()[:KEY_LENGTH]
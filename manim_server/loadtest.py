@@ -0,0 +1,384 @@
+"""
+Manim Server Load Test - replays realistic /render traffic against a server
+Ramps through increasing concurrency levels, each worker looping over a
+weighted mix of request kinds, and reports throughput, p50/p95/p99 latency,
+error/timeout rates and cache hit ratio per stage and over time.
+
+Request kinds:
+  preset  - the same built-in scene for everyone (a class opening the page at once);
+            with --fresh-preset each stage gets its own variant, so every
+            stage starts on an empty cache
+  unique  - a small custom scene that differs per request, always a fresh render
+  cached  - a small scene rendered during warm-up, always a cache hit
+  video   - a ranged GET of a rendered video at a random offset (a seek)
+
+Only uses the standard library, so it can run from any machine.
+
+Usage:
+    python server.py &
+    python loadtest.py --stages 1,10,30,60 --stage-duration 60
+    python loadtest.py --mix preset=1 --stages 60 --stage-duration 120 -o burst.json
+    python loadtest.py --mix preset=1 --stages 1,10,30,60 --fresh-preset
+"""
+
+import argparse
+import http.client
+import json
+import random
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+SERVER_DIR = Path(__file__).parent
+PRESET_FILE = SERVER_DIR / "manim_scenes" / "graph_traversal.py"
+PRESET_SCENE = 'BFSVisualization'
+# Part of the scene, so changing it changes the cache key
+PRESET_TITLE = 'Breadth-First Search (BFS)'
+
+DEFAULT_MIX = 'preset=2,unique=1,cached=4,video=4'
+KINDS = ['preset', 'unique', 'cached', 'video']
+
+CACHED_CODE = """from manim import *
+
+class LoadTestCached(Scene):
+    def construct(self):
+        self.play(Create(Circle()))
+"""
+
+UNIQUE_CODE = """from manim import *
+
+class LoadTestUnique(Scene):
+    def construct(self):
+        square = Square(side_length={size})
+        self.play(Create(square))
+        self.play(square.animate.rotate({angle}))
+"""
+
+
+def parse_mix(text):
+    """'preset=2,video=4' -> {'preset': 2.0, 'video': 4.0}"""
+    mix = {}
+    for part in text.split(','):
+        kind, _, weight = part.partition('=')
+        kind = kind.strip()
+        if kind not in KINDS:
+            raise argparse.ArgumentTypeError(f"unknown request kind: {kind}")
+        mix[kind] = float(weight or 1)
+    return mix
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of an unsorted list"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(0, int(round(pct / 100 * len(ordered))) - 1)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+class LoadTest:
+    """Issues requests against one server and collects a record per request"""
+
+    def __init__(self, base_url, mix, quality, timeout, seed, fresh_preset=False):
+        self.base_url = base_url.rstrip('/')
+        self.mix = mix
+        self.quality = quality
+        self.timeout = timeout
+        self.rng = random.Random(seed)
+        self.rng_lock = threading.Lock()
+        self.unique_counter = 0
+        self.records = []
+        self.records_lock = threading.Lock()
+        self.preset_code = PRESET_FILE.read_text()
+        self.fresh_preset = fresh_preset
+        if fresh_preset and f'"{PRESET_TITLE}"' not in self.preset_code:
+            raise ValueError(f"{PRESET_FILE.name} no longer has the title {PRESET_TITLE!r}")
+        self.video_url = None
+        self.video_size = None
+
+    # ---- HTTP helpers -------------------------------------------------
+
+    def post_render(self, code, scene_name):
+        body = json.dumps({
+            'code': code,
+            'scene_name': scene_name,
+            'quality': self.quality
+        }).encode()
+        req = urllib.request.Request(
+            f"{self.base_url}/render",
+            data=body,
+            headers={'Content-Type': 'application/json'}
+        )
+        return self._open(req, parse_json=True)
+
+    def get_video(self, offset, length):
+        req = urllib.request.Request(
+            f"{self.base_url}{self.video_url}",
+            headers={'Range': f"bytes={offset}-{offset + length - 1}"}
+        )
+        return self._open(req, parse_json=False)
+
+    def _open(self, req, parse_json):
+        """
+        Return (status_code, payload, timed_out). Never raises for a bad
+        response: a truncated body or invalid JSON comes back with payload
+        None, so it is recorded as an error instead of killing the worker.
+        """
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+                status = resp.status
+                raw = resp.read()
+        except urllib.error.HTTPError as e:
+            try:
+                raw = e.read()
+            except (http.client.HTTPException, OSError):
+                raw = None
+            # The server itself reports render timeouts as 408
+            return e.code, self._parse(raw, parse_json), e.code == 408
+        except (TimeoutError, OSError) as e:
+            timed_out = isinstance(e, TimeoutError) or 'timed out' in str(e)
+            return None, None, timed_out
+        except http.client.HTTPException:
+            # e.g. IncompleteRead or RemoteDisconnected from an overloaded server
+            return None, None, False
+        return status, self._parse(raw, parse_json), False
+
+    @staticmethod
+    def _parse(raw, parse_json):
+        if raw is None or not parse_json:
+            return raw
+        try:
+            return json.loads(raw)
+        except ValueError:
+            return None
+
+    # ---- Traffic ------------------------------------------------------
+
+    def warm_up(self):
+        """Render the cached scene once and remember its video for seeks"""
+        status, data, _ = self.post_render(CACHED_CODE, 'LoadTestCached')
+        if status != 200 or not data or data.get('status') != 'success':
+            raise RuntimeError(f"warm-up render failed: {status} {data}")
+        self.video_url = data['video_url']
+        status, payload, _ = self._open(
+            urllib.request.Request(f"{self.base_url}{self.video_url}"),
+            parse_json=False
+        )
+        if status != 200:
+            raise RuntimeError(f"warm-up video fetch failed: {status}")
+        self.video_size = len(payload)
+
+    def preset_for(self, stage):
+        """The preset scene code, renamed per stage with --fresh-preset"""
+        if not self.fresh_preset:
+            return self.preset_code
+        return self.preset_code.replace(
+            f'"{PRESET_TITLE}"', f'"{PRESET_TITLE} - stage {stage}"'
+        )
+
+    def pick_kind(self):
+        with self.rng_lock:
+            kinds = list(self.mix)
+            return self.rng.choices(kinds, weights=[self.mix[k] for k in kinds])[0]
+
+    def one_request(self, stage, kind):
+        start = time.perf_counter()
+        cached = None
+        if kind == 'preset':
+            status, data, timed_out = self.post_render(self.preset_for(stage), PRESET_SCENE)
+        elif kind == 'cached':
+            status, data, timed_out = self.post_render(CACHED_CODE, 'LoadTestCached')
+        elif kind == 'unique':
+            with self.rng_lock:
+                self.unique_counter += 1
+                size = 1 + self.unique_counter / 1000
+                angle = round(self.rng.uniform(0.1, 3.0), 4)
+            code = UNIQUE_CODE.format(size=size, angle=angle)
+            status, data, timed_out = self.post_render(code, 'LoadTestUnique')
+        else:
+            with self.rng_lock:
+                offset = self.rng.randrange(max(1, self.video_size - 65536))
+            status, data, timed_out = self.get_video(offset, 65536)
+        end = time.perf_counter()
+
+        if kind == 'video':
+            ok = status in (200, 206)
+        else:
+            ok = status == 200 and isinstance(data, dict) and data.get('status') == 'success'
+            if ok:
+                cached = bool(data.get('cached'))
+
+        self.record({
+            'stage': stage,
+            'kind': kind,
+            'start': start,
+            'latency': end - start,
+            'status': status,
+            'ok': ok,
+            'timed_out': timed_out,
+            'cached': cached
+        })
+
+    def record(self, entry):
+        with self.records_lock:
+            self.records.append(entry)
+
+    def run_stage(self, stage, concurrency, duration):
+        """
+        Run `concurrency` closed-loop workers for `duration` seconds.
+        All workers fire their first request together, like a class hitting
+        the page at the same moment.
+        """
+        barrier = threading.Barrier(concurrency)
+        deadline = [None]
+
+        def worker():
+            if barrier.wait() == 0:
+                deadline[0] = time.perf_counter() + duration
+            while deadline[0] is None:
+                time.sleep(0.001)
+            while time.perf_counter() < deadline[0]:
+                self.one_request(stage, self.pick_kind())
+
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for future in [pool.submit(worker) for _ in range(concurrency)]:
+                future.result()
+
+
+def summarize(records, elapsed):
+    """Throughput, latency percentiles, error/timeout and cache hit rates"""
+    if not records:
+        return {'requests': 0}
+    # Failed and timed-out requests count at their elapsed time, otherwise
+    # the tail would improve exactly when the server saturates
+    latencies = [r['latency'] for r in records]
+    renders = [r for r in records if r['cached'] is not None]
+    summary = {
+        'requests': len(records),
+        'throughput': len(records) / elapsed if elapsed else None,
+        'p50': percentile(latencies, 50),
+        'p95': percentile(latencies, 95),
+        'p99': percentile(latencies, 99),
+        'max': max(latencies) if latencies else None,
+        'error_rate': sum(not r['ok'] for r in records) / len(records),
+        'timeout_rate': sum(r['timed_out'] for r in records) / len(records),
+        'cache_hit_ratio': (sum(r['cached'] for r in renders) / len(renders)
+                            if renders else None)
+    }
+    return summary
+
+
+def build_report(test, stage_spans, bucket):
+    report = {'stages': [], 'timeline': []}
+    origin = min(start for start, _ in stage_spans.values()) if stage_spans else 0
+
+    for (stage, concurrency), (start, end) in stage_spans.items():
+        stage_records = [r for r in test.records if r['stage'] == stage]
+        entry = {'stage': stage, 'concurrency': concurrency, 'duration': end - start}
+        entry.update(summarize(stage_records, end - start))
+        entry['by_kind'] = {
+            kind: summarize([r for r in stage_records if r['kind'] == kind], end - start)
+            for kind in test.mix
+        }
+        report['stages'].append(entry)
+
+    # Fixed-width time buckets across the whole run
+    if test.records:
+        last = max(r['start'] + r['latency'] for r in test.records)
+        t = origin
+        while t < last:
+            in_bucket = [r for r in test.records
+                         if t <= r['start'] + r['latency'] < t + bucket]
+            entry = {'t': t - origin}
+            entry.update(summarize(in_bucket, bucket))
+            report['timeline'].append(entry)
+            t += bucket
+    return report
+
+
+def fmt(value, scale=1.0, spec='.2f'):
+    return '-' if value is None else format(value * scale, spec)
+
+
+def print_report(report):
+    print()
+    print(f"{'stage':>5} {'conc':>5} {'reqs':>6} {'req/s':>7} {'p50 s':>7} "
+          f"{'p95 s':>7} {'p99 s':>7} {'err %':>6} {'tmo %':>6} {'hit %':>6}")
+    for s in report['stages']:
+        print(f"{s['stage']:>5} {s['concurrency']:>5} {s.get('requests', 0):>6} "
+              f"{fmt(s.get('throughput')):>7} {fmt(s.get('p50')):>7} "
+              f"{fmt(s.get('p95')):>7} {fmt(s.get('p99')):>7} "
+              f"{fmt(s.get('error_rate'), 100, '.1f'):>6} "
+              f"{fmt(s.get('timeout_rate'), 100, '.1f'):>6} "
+              f"{fmt(s.get('cache_hit_ratio'), 100, '.1f'):>6}")
+        for kind, k in s['by_kind'].items():
+            if k.get('requests'):
+                print(f"{'':>5} {kind:>12} {k['requests']:>6} {'':>7} "
+                      f"{fmt(k['p50']):>7} {fmt(k['p95']):>7} {fmt(k['p99']):>7} "
+                      f"{fmt(k['error_rate'], 100, '.1f'):>6} "
+                      f"{fmt(k['timeout_rate'], 100, '.1f'):>6}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test the Manim server')
+    parser.add_argument('--url', default='http://localhost:5000',
+                        help='server base URL')
+    parser.add_argument('--mix', type=parse_mix, default=parse_mix(DEFAULT_MIX),
+                        help=f'weighted request mix (default: {DEFAULT_MIX})')
+    parser.add_argument('--stages', default='1,5,15,30,60',
+                        help='comma separated concurrency levels to ramp through')
+    parser.add_argument('--stage-duration', type=float, default=60,
+                        help='seconds to hold each concurrency level')
+    parser.add_argument('--quality', default='low', choices=['low', 'medium', 'high'])
+    parser.add_argument('--timeout', type=float, default=180,
+                        help='client-side timeout per request in seconds')
+    parser.add_argument('--bucket', type=float, default=5,
+                        help='width of the timeline buckets in seconds')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--fresh-preset', action='store_true',
+                        help='give each stage its own preset variant, so later '
+                             'stages are not all cache hits')
+    parser.add_argument('-o', '--output', type=Path,
+                        help='write the full report as JSON')
+    args = parser.parse_args()
+
+    test = LoadTest(args.url, args.mix, args.quality, args.timeout, args.seed,
+                    args.fresh_preset)
+    print(f"🔥 Warming up against {test.base_url} ...")
+    try:
+        test.warm_up()
+    except (RuntimeError, OSError) as e:
+        print(f"❌ {e}")
+        return 2
+
+    stage_spans = {}
+    for stage, concurrency in enumerate(int(c) for c in args.stages.split(',')):
+        print(f"📈 Stage {stage}: {concurrency} concurrent clients for {args.stage_duration:.0f}s",
+              flush=True)
+        start = time.perf_counter()
+        test.run_stage(stage, concurrency, args.stage_duration)
+        stage_spans[(stage, concurrency)] = (start, time.perf_counter())
+
+    report = build_report(test, stage_spans, args.bucket)
+    report['config'] = {
+        'url': test.base_url,
+        'mix': args.mix,
+        'quality': args.quality,
+        'stage_duration': args.stage_duration,
+        'timeout': args.timeout,
+        'fresh_preset': args.fresh_preset
+    }
+    print_report(report)
+
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+        print(f"📁 Report: {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
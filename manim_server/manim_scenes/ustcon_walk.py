@@ -0,0 +1,123 @@
+"""
+Pre-built Manim scene for the USTCON zig-zag walk
+The walk is computed by ustcon_engine (the same rotation maps as the USTCON
+page) and animated on the original graph: during every step the token
+follows the route that coordinate a of the current vertex (a, b) of the
+regularized graph took through the graph.
+"""
+
+import sys
+from pathlib import Path
+
+from manim import *
+
+# ustcon_engine lives next to the server, one level up
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from ustcon_engine import solve
+
+# Default graph: an 8-cycle with a chord
+DEFAULT_N = 8
+DEFAULT_EDGES = [
+    [0, 1], [1, 2], [2, 3], [3, 4],
+    [4, 5], [5, 6], [6, 7], [7, 0],
+    [1, 5]
+]
+DEFAULT_S = 0
+DEFAULT_T = 6
+
+
+def circle_positions(n, radius=2.2):
+    angles = np.linspace(PI / 2, PI / 2 + TAU, n, endpoint=False)
+    return {i: np.array([radius * np.cos(a), radius * np.sin(a) - 0.3, 0])
+            for i, a in enumerate(angles)}
+
+
+class USTCONWalk(Scene):
+    """Animated USTCON walk through the zig-zag product"""
+
+    n = DEFAULT_N
+    edges = DEFAULT_EDGES
+    s = DEFAULT_S
+    t = DEFAULT_T
+
+    def construct(self):
+        result = solve(self.n, self.edges, self.s, self.t)
+        positions = circle_positions(self.n)
+
+        # Title
+        title = Text("USTCON: Zig-Zag Walk", font_size=36)
+        title.to_edge(UP)
+        self.play(Write(title))
+
+        # Create graph visualization
+        nodes = {}
+        edges = []
+
+        for node_id, pos in positions.items():
+            circle = Circle(radius=0.35, color=BLUE, fill_opacity=0.3)
+            circle.move_to(pos)
+            label = Text(str(node_id), font_size=22).move_to(pos)
+            nodes[node_id] = VGroup(circle, label)
+
+        for u, v in self.edges:
+            if u != v:
+                edges.append(Line(positions[u], positions[v], color=GREY))
+
+        self.play(*[Create(edge) for edge in edges], run_time=0.8)
+        self.play(*[Create(node) for node in nodes.values()], run_time=0.8)
+
+        # Mark s and t
+        self.play(
+            nodes[self.s][0].animate.set_fill(GREEN, opacity=0.8),
+            nodes[self.t][0].animate.set_fill(RED, opacity=0.8),
+            run_time=0.5
+        )
+
+        # Sizes of the implicit graphs
+        stats = VGroup(
+            Text(f"G_reg: {result['n_reg']} vertices, 16-regular", font_size=20),
+            Text(f"H: {result['expander_size']} vertices", font_size=20),
+            Text(f"L = {result['levels']} levels", font_size=20),
+        ).arrange(DOWN, aligned_edge=LEFT, buff=0.15)
+        stats.to_corner(UL).shift(DOWN * 0.8)
+        self.play(Write(stats), run_time=1)
+
+        # Registers: the only state the algorithm keeps
+        def register_text(entry):
+            edge = '-' if entry['edge_type'] is None else entry['edge_type']
+            return Text(
+                f"step {entry['step']}   edge {edge}   "
+                f"v = ({entry['a']}, {entry['b']})   h = {entry['h']}",
+                font_size=22
+            ).to_edge(DOWN)
+
+        trace = result['trace']
+        registers = register_text(trace[0])
+        token = Dot(positions[trace[0]['a']], radius=0.12, color=YELLOW)
+        self.play(Write(registers), FadeIn(token))
+
+        # Walk, one edge of the graph at a time
+        for entry in trace[1:]:
+            self.play(Transform(registers, register_text(entry)), run_time=0.3)
+            hops = entry['path'][1:]
+            for vertex in hops:
+                self.play(
+                    token.animate.move_to(positions[vertex]),
+                    run_time=max(0.15, 0.6 / len(hops))
+                )
+            self.play(
+                nodes[entry['a']][0].animate.set_stroke(YELLOW, width=4),
+                run_time=0.2
+            )
+
+        # Final message
+        if result['connected']:
+            message = Text(f"{self.s} → {self.t}: CONNECTED", font_size=30, color=GREEN)
+        elif result['connected'] is None:
+            message = Text(f"{self.s} → {self.t}: not reached within the search limits",
+                           font_size=30, color=ORANGE)
+        else:
+            message = Text(f"{self.s} → {self.t}: NOT CONNECTED", font_size=30, color=RED)
+        message.next_to(title, DOWN)
+        self.play(Write(message))
+        self.wait(2)
@@ -0,0 +1,220 @@
+"""
+Parallel section rendering for long scenes
+A scene declares its boundaries with Manim's own `self.next_section(...)`.
+Each section is rendered by its own Manim process: every other section is
+run with its animations skipped, so mobjects still reach exactly the state
+they would have in a serial render, but no frames are drawn for them. The
+section videos are then stitched with ffmpeg's concat demuxer without
+re-encoding. If any process fails, the job's other processes are killed.
+
+Run as a script this is the worker, a thin wrapper around the manim CLI:
+    python render_sections.py count <count_file> <manim render args...>
+    python render_sections.py section <index> <manim render args...>
+"""
+
+import inspect
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+from pathlib import Path
+
+WORKER = Path(__file__).resolve()
+
+# One pool shared by every request, so concurrent parallel renders never
+# run more Manim processes than there are cores between them
+MAX_WORKERS = os.cpu_count() or 1
+_pool = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix='section')
+
+
+def _patch_sections(render_index):
+    """
+    Make every section except `render_index` skip its animations and
+    return a function giving the number of sections seen so far.
+    Section 0 is the one Manim opens automatically before construct().
+    """
+    from manim.scene.scene_file_writer import SceneFileWriter
+
+    original = SceneFileWriter.next_section
+    signature = inspect.signature(original)
+    seen = [0]
+
+    def next_section(self, *args, **kwargs):
+        index = seen[0]
+        seen[0] += 1
+        bound = signature.bind(self, *args, **kwargs)
+        if index != render_index:
+            bound.arguments['skip_animations'] = True
+        return original(*bound.args, **bound.kwargs)
+
+    SceneFileWriter.next_section = next_section
+    return lambda: seen[0]
+
+
+def worker_main(argv):
+    mode, value, manim_args = argv[0], argv[1], argv[2:]
+    from manim.__main__ import main as manim_main
+
+    if mode == 'count':
+        # Skip everything and write nothing, we only want the section count
+        section_count = _patch_sections(render_index=-1)
+        manim_args = manim_args + ['--dry_run']
+    else:
+        section_count = _patch_sections(render_index=int(value))
+
+    try:
+        manim_main(args=['render'] + manim_args, prog_name='manim')
+    except SystemExit as e:
+        if e.code:
+            raise
+    if mode == 'count':
+        Path(value).write_text(str(section_count()))
+
+
+def remaining(deadline, cmd):
+    """Seconds left before `deadline` (time.monotonic()), or TimeoutExpired"""
+    left = deadline - time.monotonic()
+    if left <= 0:
+        raise subprocess.TimeoutExpired(cmd, 0)
+    return left
+
+
+class ProcessGroup:
+    """The worker processes of one job, so a failure can stop all of them"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._processes = set()
+        self._stopped = False
+
+    def run(self, cmd, deadline):
+        """Like subprocess.run(check=True), but killed by stop()"""
+        with self._lock:
+            if self._stopped:
+                raise subprocess.CalledProcessError(
+                    -1, cmd, '', 'cancelled, another process of this job failed'
+                )
+            process = subprocess.Popen(
+                cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True
+            )
+            self._processes.add(process)
+        try:
+            stdout, stderr = process.communicate(timeout=remaining(deadline, cmd))
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.communicate()
+            raise
+        finally:
+            with self._lock:
+                self._processes.discard(process)
+        if process.returncode != 0:
+            raise subprocess.CalledProcessError(process.returncode, cmd, stdout, stderr)
+        return stdout
+
+    def stop(self):
+        """Kill every running process and refuse to start new ones"""
+        with self._lock:
+            self._stopped = True
+            for process in self._processes:
+                process.kill()
+
+
+def _run_worker(args, group, deadline):
+    return group.run([sys.executable, str(WORKER)] + args, deadline)
+
+
+def count_sections(manim_args, work_dir, group, deadline):
+    count_file = work_dir / "section_count"
+    _run_worker(['count', str(count_file)] + manim_args, group, deadline)
+    return int(count_file.read_text())
+
+
+def concat_videos(videos, output_path, deadline):
+    """Losslessly join videos with identical encoding settings"""
+    list_file = output_path.with_suffix('.txt')
+    list_file.write_text(''.join(f"file '{video}'\n" for video in videos))
+    cmd = ['ffmpeg', '-y', '-loglevel', 'error',
+           '-f', 'concat', '-safe', '0', '-i', str(list_file),
+           '-c', 'copy', '-movflags', '+faststart', str(output_path)]
+    result = subprocess.run(
+        cmd,
+        capture_output=True,
+        text=True,
+        timeout=remaining(deadline, cmd)
+    )
+    if result.returncode != 0:
+        raise subprocess.CalledProcessError(
+            result.returncode, result.args, result.stdout, result.stderr
+        )
+    return output_path
+
+
+def render_in_sections(scene_file, scene_name, quality_flag,
+                       job_dir, output_name, deadline, config_file):
+    """
+    Render `scene_name` section by section in parallel and return the path
+    of the stitched video, or None if the scene has fewer than two sections
+    (or ffmpeg isn't available) and should be rendered serially instead.
+
+    Every process runs on the shared pool. The whole job, including time
+    spent queued behind other requests, must finish by `deadline`
+    (a time.monotonic() value). `config_file` is passed to every manim run
+    (the server's points the LaTeX and text caches at a shared dir).
+
+    Raises subprocess.CalledProcessError if a worker or ffmpeg fails and
+    subprocess.TimeoutExpired once the deadline has passed. Either way no
+    process of the job is still running when it returns.
+    """
+    if shutil.which('ffmpeg') is None:
+        return None
+
+    scene_file = Path(scene_file)
+    job_dir = Path(job_dir)
+    group = ProcessGroup()
+
+    def manim_args(media_dir):
+        return [quality_flag, str(scene_file), scene_name,
+                '-o', output_name, '--media_dir', str(media_dir),
+                '--config_file', str(config_file)]
+
+    # The count pass builds every mobject, so it also fills the shared
+    # LaTeX/text caches before the sections start reading them in parallel
+    sections = _pool.submit(
+        count_sections, manim_args(job_dir / "count"), job_dir, group, deadline
+    ).result()
+    if sections < 2:
+        return None
+
+    def render_section(index):
+        media_dir = job_dir / f"section_{index}"
+        _run_worker(['section', str(index)] + manim_args(media_dir), group, deadline)
+        # A section without animations produces no video
+        return next(media_dir.glob(f"videos/**/{output_name}.mp4"), None)
+
+    futures = [_pool.submit(render_section, index) for index in range(sections)]
+    try:
+        # Notice a failing section right away, not once the ones before it end
+        done, _ = wait(futures, return_when=FIRST_EXCEPTION)
+        for future in done:
+            future.result()
+        videos = [v for v in (f.result() for f in futures) if v is not None]
+    except BaseException:
+        # Free the pool for other requests and stop writing into job_dir,
+        # which the caller is about to remove
+        for future in futures:
+            future.cancel()
+        group.stop()
+        wait(futures)
+        raise
+
+    return concat_videos(videos, job_dir / f"{output_name}.mp4", deadline)
+
+
+if __name__ == '__main__':
+    worker_main(sys.argv[1:])
@@ -7,12 +7,18 @@ from flask import Flask, request, jsonify, send_file, send_from_directory
 from flask_cors import CORS
 import subprocess
 import os
+import re
 import tempfile
 import shutil
-import hashlib
 import json
+import threading
+import time
 from pathlib import Path
 
+from cache_key import KEY_LENGTH, scene_cache_key
+from render_sections import render_in_sections, remaining
+import ustcon_engine
+
 app = Flask(__name__)
 CORS(app)  # Allow cross-origin requests from frontend
 
@@ -21,10 +27,75 @@ MANIM_OUTPUT_DIR = Path(__file__).parent / "manim_output"
 MANIM_SCENES_DIR = Path(__file__).parent / "manim_scenes"
 CACHE_DIR = Path(__file__).parent / "cache"
 
+# Wall-clock limit for one /render job, however it is rendered
+RENDER_TIMEOUT = 120
+
+# Limits for one /ustcon/trace request. Memory grows with n and the edge
+# count, search time with max_states and max_path_len; searches beyond
+# USTCON_CONCURRENCY wait up to USTCON_QUEUE_TIMEOUT seconds for a slot
+USTCON_MAX_N = 20000
+USTCON_MAX_EDGES = 6 * USTCON_MAX_N
+USTCON_MAX_STATES = 1 << 14
+USTCON_CONCURRENCY = 2
+USTCON_QUEUE_TIMEOUT = 10
+ustcon_slots = threading.BoundedSemaphore(USTCON_CONCURRENCY)
+
+# Manim caches compiled LaTeX and rendered text as SVGs under its media
+# dir. Jobs get a private media dir, so point these at one shared place
+# that outlives them; the config file is passed to every manim run
+TEX_DIR = MANIM_OUTPUT_DIR / "Tex"
+TEXT_DIR = MANIM_OUTPUT_DIR / "texts"
+MANIM_CONFIG = MANIM_OUTPUT_DIR / "manim.cfg"
+
+# Per-job working dirs are named "<cache key>_<random>"
+JOB_DIR_PATTERN = re.compile(rf"[0-9a-f]{{{KEY_LENGTH}}}_")
+
 # Create directories
 MANIM_OUTPUT_DIR.mkdir(exist_ok=True)
 MANIM_SCENES_DIR.mkdir(exist_ok=True)
 CACHE_DIR.mkdir(exist_ok=True)
+MANIM_CONFIG.write_text(f"[CLI]\ntex_dir = {TEX_DIR}\ntext_dir = {TEXT_DIR}\n")
+
+# Let scenes import helpers that live next to the server (e.g. ustcon_engine),
+# wherever their code is written to before rendering
+os.environ['PYTHONPATH'] = os.pathsep.join(
+    filter(None, [str(Path(__file__).parent), os.environ.get('PYTHONPATH')])
+)
+
+def sweep_stale_jobs():
+    """
+    Remove job dirs left behind by a server that was killed mid-render.
+    A job never runs longer than RENDER_TIMEOUT, so anything older is dead.
+    """
+    cutoff = time.time() - RENDER_TIMEOUT
+    for path in MANIM_OUTPUT_DIR.iterdir():
+        if (JOB_DIR_PATTERN.match(path.name) and path.is_dir()
+                and path.stat().st_mtime < cutoff):
+            shutil.rmtree(path, ignore_errors=True)
+
+
+sweep_stale_jobs()
+
+
+def find_video(media_dir, name):
+    """
+    Locate Manim's output in a job's private media dir. The subdirectory
+    depends on the scene's own config (resolution, frame rate), so search
+    for it; the dir only ever holds this one render.
+    """
+    return next(Path(media_dir).glob(f"videos/**/{name}.mp4"), None)
+
+
+def store_in_cache(video_path, cache_path):
+    """Atomically move a rendered video into the cache"""
+    try:
+        os.replace(video_path, cache_path)
+    except OSError:
+        # Cache on another filesystem: copy next to it, then rename
+        fd, tmp_path = tempfile.mkstemp(prefix='.', suffix='.mp4', dir=cache_path.parent)
+        os.close(fd)
+        shutil.copyfile(video_path, tmp_path)
+        os.replace(tmp_path, cache_path)
 
 
 @app.route('/health', methods=['GET'])
@@ -58,7 +129,8 @@ def render_animation():
     {
         "code": "from manim import *\n...",
         "scene_name": "MyScene",
-        "quality": "low"  # low, medium, high
+        "quality": "low",  # low, medium, high
+        "parallel": false  # render next_section() sections in parallel
     }
     """
     data = request.json
@@ -73,8 +145,8 @@ def render_animation():
         'high': '-qh'      # 1080p, 60fps
     }
     
-    # Create hash for caching
-    code_hash = hashlib.md5(f"{code}{scene_name}{quality}".encode()).hexdigest()[:12]
+    # Create hash for caching (cosmetic edits share the same key)
+    code_hash = scene_cache_key(code, scene_name, quality)
     cache_path = CACHE_DIR / f"{code_hash}.mp4"
     
     # Check cache
@@ -85,27 +157,53 @@ def render_animation():
             'cached': True
         })
     
-    # Create temporary file for the scene
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.py', delete=False) as f:
-        f.write(code)
-        temp_file = f.name
+    # Each job renders into its own working dir, so finding the output never
+    # depends on past renders and everything Manim leaves behind (videos,
+    # images, partial movies) can be removed afterwards; the LaTeX and text
+    # caches live outside it
+    sweep_stale_jobs()
+    deadline = time.monotonic() + RENDER_TIMEOUT
+    job_dir = Path(tempfile.mkdtemp(prefix=f"{code_hash}_", dir=MANIM_OUTPUT_DIR))
+    scene_file = job_dir / "scene.py"
+    scene_file.write_text(code)
     
     try:
+        if data.get('parallel'):
+            # Render each section in its own process and stitch the videos;
+            # falls through to a normal render if there's only one section
+            stitched = render_in_sections(
+                scene_file,
+                scene_name,
+                quality_flags.get(quality, '-ql'),
+                job_dir,
+                code_hash,
+                deadline,
+                MANIM_CONFIG
+            )
+            if stitched is not None:
+                store_in_cache(stitched, cache_path)
+                return jsonify({
+                    'status': 'success',
+                    'video_url': f'/video/{code_hash}.mp4',
+                    'cached': False
+                })
+        
         # Run Manim
         cmd = [
             'manim',
             quality_flags.get(quality, '-ql'),
-            temp_file,
+            str(scene_file),
             scene_name,
             '-o', f'{code_hash}',
-            '--media_dir', str(MANIM_OUTPUT_DIR)
+            '--media_dir', str(job_dir),
+            '--config_file', str(MANIM_CONFIG)
         ]
         
         result = subprocess.run(
             cmd,
             capture_output=True,
             text=True,
-            timeout=120  # 2 minute timeout
+            timeout=remaining(deadline, cmd)
         )
         
         if result.returncode != 0:
@@ -115,17 +213,10 @@ def render_animation():
                 'stdout': result.stdout
             }), 400
         
-        # Find the output video
-        video_path = None
-        for root, dirs, files in os.walk(MANIM_OUTPUT_DIR):
-            for file in files:
-                if file.endswith('.mp4') and code_hash in file:
-                    video_path = Path(root) / file
-                    break
-        
-        if video_path and video_path.exists():
+        video_path = find_video(job_dir, code_hash)
+        if video_path is not None:
             # Move to cache
-            shutil.copy(video_path, cache_path)
+            store_in_cache(video_path, cache_path)
             
             return jsonify({
                 'status': 'success',
@@ -140,10 +231,16 @@ def render_animation():
                 'stderr': result.stderr
             }), 500
             
+    except subprocess.CalledProcessError as e:
+        return jsonify({
+            'status': 'error',
+            'error': e.stderr,
+            'stdout': e.stdout
+        }), 400
     except subprocess.TimeoutExpired:
         return jsonify({
             'status': 'error',
-            'error': 'Rendering timed out (>2 minutes)'
+            'error': f'Rendering timed out (>{RENDER_TIMEOUT // 60} minutes)'
         }), 408
     except Exception as e:
         return jsonify({
@@ -151,8 +248,8 @@ def render_animation():
             'error': str(e)
         }), 500
     finally:
-        # Cleanup temp file
-        os.unlink(temp_file)
+        # Cleanup partial movies, images, logs and the scene file
+        shutil.rmtree(job_dir, ignore_errors=True)
 
 
 @app.route('/video/<filename>')
@@ -198,6 +295,85 @@ def render_preset(scene_name):
     return render_animation()
 
 
+def is_json_int(value):
+    """An integer from JSON; bool is an int too, but never a sensible one"""
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+@app.route('/ustcon/trace', methods=['POST'])
+def ustcon_trace():
+    """
+    Run the USTCON walk search server-side and return its trace
+    
+    Request body:
+    {
+        "n": 6,                      # number of vertices
+        "edges": [[0, 1], [1, 2]],   # in the order the page built them
+        "s": 0,
+        "t": 2,
+        "max_path_len": 50,          # optional, 1 to 50
+        "max_states": 16384          # optional, distinct states per step, 1 to 16384
+    }
+    """
+    data = request.json or {}
+    if not isinstance(data, dict):
+        return jsonify({'status': 'error', 'error': 'request body must be a JSON object'}), 400
+    n = data.get('n', 0)
+    edges = data.get('edges', [])
+    s = data.get('s', 0)
+    t = data.get('t', 0)
+    max_path_len = data.get('max_path_len', ustcon_engine.MAX_PATH_LEN)
+    max_states = data.get('max_states', USTCON_MAX_STATES)
+
+    limits = [
+        ('n', n, 2, USTCON_MAX_N),
+        ('s', s, 0, USTCON_MAX_N - 1),
+        ('t', t, 0, USTCON_MAX_N - 1),
+        ('max_path_len', max_path_len, 1, ustcon_engine.MAX_PATH_LEN),
+        ('max_states', max_states, 1, USTCON_MAX_STATES)
+    ]
+    for name, value, low, high in limits:
+        if not is_json_int(value):
+            error = f'{name} must be an integer'
+        elif not low <= value <= high:
+            error = f'{name} must be between {low} and {high}'
+        else:
+            continue
+        return jsonify({'status': 'error', 'error': error}), 400
+    if not isinstance(edges, list):
+        return jsonify({'status': 'error', 'error': 'edges must be a list of pairs'}), 400
+    if len(edges) > USTCON_MAX_EDGES:
+        return jsonify({
+            'status': 'error',
+            'error': f'at most {USTCON_MAX_EDGES} edges are supported'
+        }), 400
+    # NumPy would happily reshape [[0], [1]] into one edge or truncate 0.5
+    for edge in edges:
+        if not (isinstance(edge, list) and len(edge) == 2
+                and all(is_json_int(v) for v in edge)):
+            return jsonify({
+                'status': 'error',
+                'error': f'every edge must be a pair of integers, got {edge!r}'
+            }), 400
+
+    if not ustcon_slots.acquire(timeout=USTCON_QUEUE_TIMEOUT):
+        return jsonify({
+            'status': 'error',
+            'error': 'Server busy, try again shortly'
+        }), 503
+    try:
+        result = ustcon_engine.solve(n, edges, s, t, max_path_len, max_states)
+    except (TypeError, ValueError, OverflowError) as e:
+        return jsonify({
+            'status': 'error',
+            'error': str(e)
+        }), 400
+    finally:
+        ustcon_slots.release()
+    
+    return jsonify({'status': 'success', **result})
+
+
 # Serve static files (for development)
 @app.route('/')
 def index():
@@ -0,0 +1,370 @@
+"""
+USTCON Engine - vectorized rotation maps and walk enumeration
+NumPy port of js/ustcon_lib/ustcon_logic.js (rot_G_16reg, rot_H, rot_zigzag,
+rot_Gexp, ustcon) that runs on the server, so the page and the Manim scene
+can use graphs far larger than the browser can handle.
+
+Every rotation map works on whole arrays of vertices at once. The
+regularized graph has N^2 vertices, so it is never materialized: only the
+padded (N, 6) adjacency table and the 256 x 16 expander table are stored.
+
+Walks are enumerated in the same order as the JS version, but as a tree:
+the paths of length k are the paths of length k-1 extended by one more
+edge, and paths that end in the same state (at the same length) continue
+identically, so only the distinct states of each length are kept.
+
+Coordinate a of a vertex (a, b) only ever moves along edges of G, so a
+walk that reaches t proves s and t connected. A walk that doesn't proves
+nothing; only a component check can answer "not connected".
+"""
+
+import hashlib
+import math
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+D = 16
+H_SIZE = D * D
+
+# rot_G_16reg only follows the first 6 neighbours of each coordinate
+MAX_NEIGHBORS = 6
+
+# JS caps the search at paths of length 50
+MAX_PATH_LEN = 50
+DEFAULT_MAX_STATES = 1 << 16
+
+CACHE_SIZE = 64
+
+H_GENERATORS = np.array([
+    [1, 0], [-1, 0], [0, 1], [0, -1], [1, 1], [1, -1], [-1, 1], [-1, -1],
+    [2, 0], [-2, 0], [0, 2], [0, -2], [2, 1], [1, 2], [-2, -1], [-1, -2]
+], dtype=np.int64)
+
+
+def _build_rot_H_table():
+    h = np.arange(H_SIZE, dtype=np.int64)[:, None]
+    x, y = h // D, h % D
+    dx, dy = H_GENERATORS[:, 0], H_GENERATORS[:, 1]
+    return (((x + dx) % D) * D + (y + dy) % D).astype(np.int32)
+
+
+# Per-edge lookup tables for rot_G_16reg: edges 0-1 are self-loops,
+# 2-3 step b around an N-cycle, 4-9 follow a neighbour of a and 10-15 a
+# neighbour of b. Nothing but 4-9 moves a, so a stays in the component of s
+_EDGES = np.arange(D)
+TORUS_DB = np.array([0, 0, 1, -1] + [0] * 12, dtype=np.int32)
+USES_A = (_EDGES >= 4) & (_EDGES < 10)
+USES_B = _EDGES >= 10
+SLOT = np.where(USES_A, _EDGES - 4, np.where(USES_B, _EDGES - 10, 0)).astype(np.int32)
+
+# ROT_H_TABLE[i, h] = rot_H(h, i) for the 16-regular expander on D x D
+ROT_H_TABLE = np.ascontiguousarray(_build_rot_H_table().T)
+
+
+# ---- Graph construction ----------------------------------------------
+
+def graph_hash(n, edges):
+    """Stable hash of a graph; edge order matters, it fixes neighbour slots"""
+    data = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+    digest = hashlib.sha1(str(int(n)).encode())
+    digest.update(data.tobytes())
+    return digest.hexdigest()[:16]
+
+
+def build_adjacency(n, edges):
+    """
+    Padded neighbour table, shape (n, 6), -1 where there is no usable edge.
+    Slots are filled in edge order, both directions, like buildAdj() in JS;
+    self-loops are kept in their slot as -1 since rot_G_16reg ignores them.
+    """
+    data = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+    if data.size and (data.min() < 0 or data.max() >= n):
+        raise ValueError(f"edge endpoint out of range for {n} vertices")
+
+    # Interleave (u, v), (v, u) to match the push order in buildAdj()
+    src = data.ravel()
+    dst = data[:, ::-1].ravel()
+
+    # Position of each entry among its source's neighbours
+    order = np.argsort(src, kind='stable')
+    src_sorted = src[order]
+    first = np.searchsorted(src_sorted, src_sorted, side='left')
+    slot = np.empty_like(src)
+    slot[order] = np.arange(len(src)) - first
+
+    adj = np.full((n, MAX_NEIGHBORS), -1, dtype=np.int32)
+    keep = slot < MAX_NEIGHBORS
+    adj[src[keep], slot[keep]] = np.where(dst[keep] == src[keep], -1, dst[keep])
+    return adj
+
+
+def component_labels(n, edges):
+    """
+    Label each vertex with the smallest vertex of its connected component.
+    Roots are hooked onto the smaller root across every edge, then every
+    vertex jumps to its root, until no edge joins two different roots.
+    """
+    data = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+    u, v = data[:, 0], data[:, 1]
+    labels = np.arange(n, dtype=np.int64)
+    while True:
+        lu, lv = labels[u], labels[v]
+        if np.array_equal(lu, lv):
+            return labels
+        np.minimum.at(labels, np.maximum(lu, lv), np.minimum(lu, lv))
+        while True:
+            jumped = labels[labels]
+            if np.array_equal(jumped, labels):
+                break
+            labels = jumped
+
+
+def walk_levels(n):
+    """L = max(1, 2 * ceil(log2(D * N^2))), as in ustcon()"""
+    return max(1, 2 * math.ceil(math.log2(max(2, D * n * n))))
+
+
+# ---- Rotation maps ---------------------------------------------------
+#
+# Vertices of G_16reg are pairs (a, b) and vertices of the zig-zag product
+# are triples (a, b, h); they are kept as separate int32 arrays, which
+# avoids a divmod on every map. pack()/unpack() convert to the single
+# integer v_h = (a * N + b) * 256 + h used by the JS version.
+
+def pack(n, a, b, h):
+    return (a.astype(np.int64) * n + b) * H_SIZE + h
+
+
+def unpack(n, v_h):
+    v, h = np.divmod(np.asarray(v_h, dtype=np.int64), H_SIZE)
+    a, b = np.divmod(v, n)
+    return a.astype(np.int32), b.astype(np.int32), h.astype(np.int32)
+
+
+def _wrap(x, n):
+    """x mod n for x in [-1, n]"""
+    return np.where(x >= n, 0, np.where(x < 0, n - 1, x))
+
+
+def rot_G_16reg(adj, n, a, b, i):
+    """16-regular graph on N^2 vertices (a, b): G on each coordinate plus a cycle on b"""
+    flat = adj.ravel()
+    slot = SLOT[i]
+    nb_a = flat[a * MAX_NEIGHBORS + slot]
+    nb_b = flat[b * MAX_NEIGHBORS + slot]
+    new_a = np.where(USES_A[i] & (nb_a >= 0), nb_a, a)
+    new_b = np.where(USES_B[i] & (nb_b >= 0), nb_b, _wrap(b + TORUS_DB[i], n))
+    return new_a, new_b
+
+
+def rot_H(h, i):
+    return ROT_H_TABLE[i % D][h]
+
+
+# The optional `moves` list collects a after every move in G, for replaying
+# a single walk; the search leaves it out.
+
+def rot_zigzag(adj, n, a, b, h, i, moves=None):
+    """Zig in H, cross an edge of G, zag in H"""
+    i1, i2 = divmod(int(i), D)
+    h = rot_H(h, i1)
+    a, b = rot_G_16reg(adj, n, a, b, h % D)
+    if moves is not None:
+        moves.append(int(a[0]))
+    h = rot_H(h, i2)
+    return a, b, h
+
+
+def rot_Gexp(adj, n, a, b, h, i, level, moves=None):
+    if level == 0:
+        a, b = rot_G_16reg(adj, n, a, b, np.full(a.shape, i % D, dtype=np.int32))
+        if moves is not None:
+            moves.append(int(a[0]))
+        return a, b, h
+    for _ in range(8):
+        a, b, h = rot_zigzag(adj, n, a, b, h, i, moves)
+    return a, b, h
+
+
+def walk_step(adj, n, a, b, h, edge_type, step, levels, moves=None):
+    """One step of a walk: descend through every level of the powered graph"""
+    edge_idx = (edge_type * D + step % D) % H_SIZE
+    for level in range(levels - 1, -1, -1):
+        a, b, h = rot_Gexp(adj, n, a, b, h, edge_idx, level, moves)
+    return a, b, h
+
+
+# ---- Walk enumeration ------------------------------------------------
+
+def ustcon(adj, n, s, t, max_path_len=None, max_states=DEFAULT_MAX_STATES,
+           labels=None):
+    """
+    Search walks from s for one whose final vertex projects onto t.
+
+    Returns a dict with 'connected' (True if such a walk was found, False
+    if `labels` from component_labels() put s and t in different
+    components, None otherwise), 'budget_exhausted' (the frontier outgrew
+    `max_states` before the length limit), the number of steps searched
+    and, if found, the edge types of the first such walk in JS enumeration
+    order.
+    """
+    levels = walk_levels(n)
+    limit = min(MAX_PATH_LEN, 2 * n * n)
+    if max_path_len is not None:
+        limit = min(limit, max_path_len)
+
+    result = {
+        'connected': None,
+        'budget_exhausted': False,
+        'levels': levels,
+        'path_len': None,
+        'edge_types': None,
+        'lengths_searched': 0,
+        'states_explored': 0,
+        'max_frontier': 1
+    }
+    if s == t:
+        result.update(connected=True, path_len=0, edge_types=[])
+        return result
+    if labels is not None and labels[s] != labels[t]:
+        result['connected'] = False
+        return result
+
+    # Frontier: distinct states after k steps, in order of their first
+    # (smallest-index) path; parents/digits let us rebuild that path
+    a, b, h = unpack(n, [s * n * H_SIZE])
+    history = []
+    for step in range(limit):
+        blocks = [walk_step(adj, n, a, b, h, edge_type, step, levels)
+                  for edge_type in range(3)]
+        a, b, h = (np.concatenate(parts) for parts in zip(*blocks))
+        parents = np.tile(np.arange(len(blocks[0][0])), 3)
+        digits = np.repeat(np.arange(3), len(blocks[0][0]))
+        result['states_explored'] += len(a)
+        result['lengths_searched'] = step + 1
+
+        hits = np.flatnonzero(a == t)
+        if hits.size:
+            edge_types = [int(digits[hits[0]])]
+            position = parents[hits[0]]
+            for prev_parents, prev_digits in reversed(history):
+                edge_types.append(int(prev_digits[position]))
+                position = prev_parents[position]
+            result.update(connected=True, path_len=step + 1,
+                          edge_types=edge_types[::-1])
+            return result
+
+        # Keep the first occurrence of each state, preserving index order
+        _, first = np.unique(pack(n, a, b, h), return_index=True)
+        first.sort()
+        if len(first) > max_states:
+            result['budget_exhausted'] = True
+            return result
+        a, b, h = a[first], b[first], h[first]
+        history.append((parents[first], digits[first]))
+        result['max_frontier'] = max(result['max_frontier'], len(first))
+
+    return result
+
+
+def loop_erase(vertices):
+    """Drop the cycles from a sequence of vertices, leaving a simple path"""
+    path = []
+    for vertex in vertices:
+        if vertex in path:
+            del path[path.index(vertex) + 1:]
+        else:
+            path.append(vertex)
+    return path
+
+
+def walk_trace(adj, n, s, edge_types):
+    """
+    Replay a walk and record the state after every step. Each entry's
+    'path' is the loop-erased route a took through G during that step,
+    from the previous entry's a to this one's.
+    """
+    levels = walk_levels(n)
+    a, b, h = unpack(n, [s * n * H_SIZE])
+    trace = [_trace_entry(0, None, n, a, b, h, [s])]
+    for step, edge_type in enumerate(edge_types):
+        moves = [int(a[0])]
+        a, b, h = walk_step(adj, n, a, b, h, edge_type, step, levels, moves)
+        trace.append(_trace_entry(step + 1, edge_type, n, a, b, h, loop_erase(moves)))
+    return trace
+
+
+def _trace_entry(step, edge_type, n, a, b, h, path):
+    a, b, h = int(a[0]), int(b[0]), int(h[0])
+    return {'step': step, 'edge_type': edge_type, 'v': a * n + b,
+            'a': a, 'b': b, 'h': h, 'path': path}
+
+
+# ---- Cached entry point ----------------------------------------------
+
+_graph_cache = OrderedDict()
+_result_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _cache_get(cache, key):
+    with _cache_lock:
+        if key in cache:
+            cache.move_to_end(key)
+            return cache[key]
+    return None
+
+
+def _cache_put(cache, key, value):
+    with _cache_lock:
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > CACHE_SIZE:
+            cache.popitem(last=False)
+
+
+def solve(n, edges, s, t, max_path_len=None, max_states=DEFAULT_MAX_STATES):
+    """
+    Run USTCON on a graph given as a vertex count and an edge list and
+    return a JSON-ready result with the trace of the walk that was found.
+
+    'connected' is True when a walk reached t and False when s and t lie
+    in different components, in which case no walk is searched. None
+    means they share a component but no walk within the limits reached t.
+    Results, adjacency tables and component labels are cached by graph hash.
+    """
+    n = int(n)
+    s, t = int(s), int(t)
+    if n < 2:
+        raise ValueError("graph needs at least 2 vertices")
+    if not (0 <= s < n and 0 <= t < n):
+        raise ValueError(f"s and t must be in [0, {n})")
+
+    key_hash = graph_hash(n, edges)
+    key = (key_hash, s, t, max_path_len, max_states)
+    cached = _cache_get(_result_cache, key)
+    if cached is not None:
+        return cached
+
+    graph = _cache_get(_graph_cache, key_hash)
+    if graph is None:
+        graph = build_adjacency(n, edges), component_labels(n, edges)
+        _cache_put(_graph_cache, key_hash, graph)
+    adj, labels = graph
+
+    search = ustcon(adj, n, s, t, max_path_len, max_states, labels)
+    result = {
+        'graph_hash': key_hash,
+        'n': n,
+        'n_reg': n * n,
+        'degree': D,
+        'expander_size': H_SIZE,
+        's': s,
+        't': t,
+        **search,
+        'trace': walk_trace(adj, n, s, search['edge_types'] or [])
+    }
+    _cache_put(_result_cache, key, result)
+    return result
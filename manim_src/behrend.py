@@ -245,6 +245,9 @@ class BehrendConstruction(Scene):
         self.play(*[FadeOut(mob) for mob in self.mobjects])
         
         # Phase 2: Formula
+        # Each phase starts from a clear screen, so it can be its own section
+        # (see manim_server/render_sections.py)
+        self.next_section("Step 2")
         phase2 = Text("Step 2: Map to Integers", font_size=32)
         self.play(Write(phase2))
         self.wait(1)
@@ -260,6 +263,7 @@ class BehrendConstruction(Scene):
         self.play(FadeOut(formula))
         
         # Phase 3: Result
+        self.next_section("Step 3")
         phase3 = Text("Step 3: The Result", font_size=32)
         self.play(Write(phase3))
         self.wait(1)